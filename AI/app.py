@@ -1,11 +1,14 @@
 import streamlit as st
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras import layers
+import os
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1") # Must be set before TF import
 import numpy as np
 import json
-from PIL import Image
-import io # Needed for camera input
+
+# TensorFlow is NOT imported here on purpose: the import costs seconds of
+# startup and hundreds of MB of RSS, so the UI shell renders before TF loads
+# lazily inside build_and_load_model (under the spinner). Helper functions
+# re-import it locally - a cheap sys.modules lookup once the loader has paid
+# the real cost.
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -19,7 +22,12 @@ st.set_page_config(
 IMG_SIZE = 224
 NUM_CLASSES = 100
 MODEL_WEIGHTS_PATH = "best_model_food100.keras" # Make sure this matches your file name
+TFLITE_MODEL_PATH = "food100_int8.tflite" # Produced offline by export_tflite.py
+ONNX_MODEL_PATH = "food100_int8.onnx" # Produced offline by export_onnx.py
 CLASS_NAMES_PATH = "class_names.json"
+# FP16 halves conv-weight traffic but only pays off on CPUs/GPUs with FP16
+# kernels (ARM NEON FP16, AVX512-FP16, any GPU) - hence opt-in via env var.
+USE_FP16 = os.environ.get("FOODLENS_FP16", "0") == "1"
 
 # --- Custom CSS (Keep as before) ---
 st.markdown("""
@@ -34,11 +42,110 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# --- INFERENCE DISPATCH ---
+def top1_from_logits(logits):
+    """Top-1 (indices, probabilities) per row, one stable pass over the logits."""
+    indices = logits.argmax(axis=-1)
+    top = logits[np.arange(logits.shape[0]), indices]
+    confidences = 1.0 / np.exp(logits - top[:, None]).sum(axis=-1)
+    return indices, confidences
+
+
+def run_inference(engine, img_array):
+    """Runs one forward pass on a (N, 224, 224, 3) batch and returns the
+    top-1 (indices, probabilities) arrays, each of shape (N,)."""
+    kind, backend = engine
+    if kind == "onnx":
+        input_meta = backend.get_inputs()[0]
+        x = img_array.astype(np.float32)
+        return top1_from_logits(backend.run(None, {input_meta.name: x})[0])
+    if kind == "tflite":
+        interpreter = backend
+        input_detail = interpreter.get_input_details()[0]
+        if input_detail["shape"][0] != img_array.shape[0]:
+            interpreter.resize_tensor_input(input_detail["index"], img_array.shape)
+            interpreter.allocate_tensors()
+            input_detail = interpreter.get_input_details()[0]
+        output_detail = interpreter.get_output_details()[0]
+        x = img_array
+        if input_detail["dtype"] == np.uint8:
+            # Quantize [0,255] float input with the stored (scale, zero_point)
+            scale, zero_point = input_detail["quantization"]
+            x = np.clip(np.round(x / scale + zero_point), 0, 255).astype(np.uint8)
+        else:
+            x = x.astype(input_detail["dtype"])
+        interpreter.set_tensor(input_detail["index"], x)
+        interpreter.invoke()
+        prediction = interpreter.get_tensor(output_detail["index"])
+        if output_detail["dtype"] == np.uint8:
+            scale, zero_point = output_detail["quantization"]
+            prediction = (prediction.astype(np.float32) - zero_point) * scale
+        return top1_from_logits(prediction)
+    # Default: concrete tf.function over the Keras model; top-1 selection
+    # runs fused inside the compiled graph, Python just reads two scalars.
+    import tensorflow as tf
+    indices, confidences = backend(tf.constant(img_array, dtype=tf.float32))
+    return indices.numpy(), confidences.numpy()
+
+
+def warm_up(engine):
+    """Runs one dummy inference so graph tracing / thread-pool init happens
+    at cache-time instead of on the first user upload."""
+    run_inference(engine, np.zeros((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32))
+    return engine
+
+
 # --- MODEL BUILDING & WEIGHTS LOADING (Corrected Again) ---
 @st.cache_resource
 def build_and_load_model():
-    """Builds the EfficientNetB0 model structure and loads the trained weights."""
+    """Loads the inference engine: INT8 ONNX, then INT8 TFLite, then Keras."""
+    # Deferred TF import (see note at the top of the file) plus one-time
+    # runtime tuning: XLA fuses EfficientNet's conv+BN+swish chains into
+    # single kernels; intra-op gets all cores for the conv loops, inter-op
+    # stays small.
+    import tensorflow as tf
+    from tensorflow import keras
+    from tensorflow.keras import layers
+    tf.config.optimizer.set_jit(True)
+    tf.config.threading.set_intra_op_parallelism_threads(os.cpu_count())
+    tf.config.threading.set_inter_op_parallelism_threads(2)
+
+    # --- Fastest path: quantized QDQ ONNX model (see export_onnx.py) ---
+    # ONNX Runtime runs the int8 graph with far less per-call dispatch
+    # overhead than Keras predict, so it wins for single-image requests.
+    if os.path.exists(ONNX_MODEL_PATH):
+        try:
+            import onnxruntime as ort
+            sess_opts = ort.SessionOptions()
+            sess_opts.intra_op_num_threads = os.cpu_count()
+            sess_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(
+                ONNX_MODEL_PATH, sess_opts, providers=["CPUExecutionProvider"]
+            )
+            return warm_up(("onnx", session))
+        except Exception as e:
+            st.warning(f"Could not load ONNX model, falling back: {e}")
+
+    # --- Fast path: quantized TFLite model (see export_tflite.py) ---
+    # INT8 halves memory traffic and uses the int8 dot-product kernels,
+    # so prefer it whenever the exported file is present.
+    if os.path.exists(TFLITE_MODEL_PATH):
+        try:
+            interpreter = tf.lite.Interpreter(
+                model_path=TFLITE_MODEL_PATH,
+                num_threads=os.cpu_count()
+            )
+            interpreter.allocate_tensors()
+            return warm_up(("tflite", interpreter))
+        except Exception as e:
+            st.warning(f"Could not load TFLite model, falling back to Keras: {e}")
+
     try:
+        if USE_FP16:
+            # Compute/store in float16 where supported; the heads below pin
+            # their own dtype to float32 so the logits stay exact.
+            keras.mixed_precision.set_global_policy("mixed_float16")
+
         # --- FIX: Use the EXACT layers from Kaggle ---
         # 1. Build the Data Augmentation Layer
         data_augmentation = keras.Sequential([
@@ -50,6 +157,12 @@ def build_and_load_model():
 
         # --- FIX: Use the EXACT initialization from Kaggle ---
         # 2. Build the Base Model (EfficientNetB0)
+        # NOTE: keras.applications.EfficientNetB0 already embeds its
+        # Rescaling + Normalization layers inside the graph (even with
+        # include_top=False), where XLA/TFLite constant-fold them into the
+        # first conv. Inputs must therefore stay raw [0,255] floats - do NOT
+        # add another Rescaling layer or call preprocess_input on the images,
+        # either of which would normalize twice and skew every prediction.
         base_model = tf.keras.applications.EfficientNetB0(
             include_top=False,
             weights=None, # Crucial: Don't load imagenet weights
@@ -65,13 +178,65 @@ def build_and_load_model():
         x = base_model(x, training=False)
         x = layers.GlobalAveragePooling2D(name="pooling_layer")(x)
         x = layers.Dropout(0.3, name="dropout_layer")(x) # Use same dropout rate
-        outputs = layers.Dense(NUM_CLASSES, activation="softmax", name="output_layer")(x)
+        output_layer = layers.Dense(NUM_CLASSES, activation="softmax", dtype="float32", name="output_layer")
+        outputs = output_layer(x)
         model = keras.Model(inputs, outputs, name="EfficientNetB0_Food100") # Model name
 
         # 4. Load the Trained Weights
         model.load_weights(MODEL_WEIGHTS_PATH)
+
+        # 5. Rebuild a serving-only model WITHOUT the augmentation block.
+        # The Random* layers are no-ops at inference but still execute identity
+        # ops per request. The base_model instance is shared by reference; the
+        # head becomes a logits-only Dense (softmax is monotonic, so argmax is
+        # unchanged and the probability is recovered in Python only for the
+        # winning class).
+        logits_layer = layers.Dense(NUM_CLASSES, activation=None, dtype="float32", name="output_logits")
+        serving_inputs = keras.Input(shape=(IMG_SIZE, IMG_SIZE, 3), name="input_layer")
+        x = base_model(serving_inputs, training=False)
+        x = layers.GlobalAveragePooling2D(name="pooling_layer")(x)
+        x = layers.Dropout(0.3, name="dropout_layer")(x)
+        serving_outputs = logits_layer(x)
+        inference_model = keras.Model(serving_inputs, serving_outputs, name="EfficientNetB0_Food100_Serving")
+        logits_layer.set_weights(output_layer.get_weights())
+
+        # Guard: no augmentation layer may leak into the serving graph. Even
+        # at training=False the Random* layers emit tf.cond nodes whose
+        # branches block XLA from fusing the input straight into the first
+        # conv, so the serving model must omit them structurally. Walk the
+        # nested layer tree so a reconnected data_augmentation Sequential is
+        # caught too, not just a top-level Random* layer.
+        augmentation_types = (layers.RandomFlip, layers.RandomRotation,
+                              layers.RandomZoom, layers.RandomContrast)
+
+        def find_augmentation_layers(layer):
+            if isinstance(layer, augmentation_types) or "augmentation" in layer.name:
+                return [layer.name]
+            return [name for sub in getattr(layer, "layers", [])
+                    for name in find_augmentation_layers(sub)]
+
+        leaked = [name for layer in inference_model.layers
+                  for name in find_augmentation_layers(layer)]
+        if leaked:
+            raise ValueError(f"Augmentation layers leaked into serving model: {leaked}")
+
+        # 6. Compile a concrete function over (N, 224, 224, 3) batches.
+        # model.predict wraps every call in a dataset iterator plus callback
+        # machinery; a concrete tf.function is a single graph execution.
+        # top_k + the winner's softmax probability run inside the compiled
+        # graph (exp(top - logsumexp) == softmax(logits)[top]), so the vector
+        # scan scales in a single fused kernel as NUM_CLASSES grows.
+        @tf.function(jit_compile=True,
+                     input_signature=[tf.TensorSpec((None, IMG_SIZE, IMG_SIZE, 3), tf.float32)])
+        def predict_fn(x):
+            logits = inference_model(x, training=False)
+            values, indices = tf.math.top_k(logits, k=1)
+            confidences = tf.exp(values[:, 0] - tf.reduce_logsumexp(logits, axis=-1))
+            return indices[:, 0], confidences
+
+        concrete = predict_fn.get_concrete_function()
         # st.success("Model loaded successfully!") # Optional success message
-        return model
+        return warm_up(("keras", concrete))
 
     except FileNotFoundError:
         st.error(f"Model weights file ('{MODEL_WEIGHTS_PATH}') not found.")
@@ -84,12 +249,13 @@ def build_and_load_model():
         return None
 
 
-@st.cache_data
+# cache_resource: the names are a shared immutable singleton, so Streamlit
+# skips the copy/pickle that cache_data would do on every rerun.
+@st.cache_resource
 def load_my_class_names():
-    # ... (Your existing class names loading code - seems correct) ...
     try:
         with open(CLASS_NAMES_PATH, 'r') as f:
-            class_names = json.load(f)
+            class_names = tuple(json.load(f))
         if len(class_names) != NUM_CLASSES:
              st.warning(f"Class names count mismatch.")
         return class_names
@@ -104,27 +270,51 @@ def load_my_class_names():
 model = build_and_load_model()
 class_names = load_my_class_names()
 
-# --- HELPER FUNCTION (process_image - Keep as before) ---
-def process_image(image_input, img_shape=IMG_SIZE):
-    # ... (Your existing image processing code - seems correct) ...
+# --- HELPER FUNCTION ---
+# Decodes upload/camera bytes exactly once, for the model only - the preview
+# shows the raw bytes, so no full-resolution copy is ever materialized here.
+# Model input stays raw [0,255] float32: EfficientNetB0 normalizes in-graph
+# (see note in build_and_load_model), so no preprocess_input here.
+def decode_once(img_bytes, img_shape=IMG_SIZE):
+    """Returns the (1, 224, 224, 3) model input from one decode, or None."""
+    import tensorflow as tf
     try:
-        if isinstance(image_input, bytes):
-            image_pil = Image.open(io.BytesIO(image_input))
-        elif isinstance(image_input, Image.Image):
-             image_pil = image_input
-        else: return None
-        if image_pil.mode != "RGB": image_pil = image_pil.convert("RGB")
-        img = image_pil.resize((img_shape, img_shape))
-        img_array = np.array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        return img_array
+        if img_bytes[:3] == b"\xff\xd8\xff":
+            # JPEG fast path: INTEGER_FAST takes libjpeg-turbo's SIMD IDCT
+            # (~3% pixel-value deviation, invisible after the 224x224
+            # downsample). PNG/WebP uploads fall through to the generic
+            # decoder below.
+            decoded = tf.io.decode_jpeg(img_bytes, channels=3, dct_method="INTEGER_FAST")
+        else:
+            decoded = tf.io.decode_image(img_bytes, channels=3, expand_animations=False)
+        resized = tf.image.resize(decoded, (img_shape, img_shape), method="bilinear")
+        buf = st.session_state.input_buf # Shared buffer (see session-state init)
+        np.copyto(buf[0], resized.numpy())
+        return buf
     except Exception as e:
         st.error(f"Error processing image: {e}")
         return None
 
+
+# Memoized on the hash of the image bytes: re-analyzing an identical image
+# (same upload, or any rerun with the form unchanged) returns the stored
+# (index, confidence) in microseconds instead of re-running the model.
+@st.cache_data(max_entries=64, show_spinner=False)
+def predict_bytes(img_bytes):
+    """Predicts (class index, confidence %) from raw image bytes."""
+    processed_img = decode_once(img_bytes)
+    if processed_img is None:
+        return None
+    indices, confidences = run_inference(model, processed_img)
+    # Confidence arrives as a probability in [0, 1]
+    return int(indices[0]), float(confidences[0]) * 100.0
+
 # --- Initialize Session State ---
-if 'show_camera' not in st.session_state:
-    st.session_state.show_camera = False
+if 'input_buf' not in st.session_state:
+    # Preallocated model-input tensor; decode_once copies the resize result
+    # into it, saving the fresh batch array + expand_dims copy per request
+    # (the resize output itself is still TF-allocated).
+    st.session_state.input_buf = np.empty((1, IMG_SIZE, IMG_SIZE, 3), dtype=np.float32)
 
 # --- STREAMLIT APP LAYOUT ---
 st.markdown("<h1 class='main-title'>🍲 Food Lens AI 📸</h1>", unsafe_allow_html=True)
@@ -153,74 +343,54 @@ st.sidebar.markdown(
 st.divider()
 
 # --- Input Options ---
-col1_input, col2_input = st.columns(2)
-
-with col1_input:
-    uploaded_file = st.file_uploader(
-        "📂 Upload an Image",
-        type=["jpg", "jpeg", "png", "webp"],
-        help="Select a food image file from your device."
-    )
-    if uploaded_file is not None:
-        st.session_state.show_camera = False # Hide camera if file is uploaded
-
-with col2_input:
-    if st.button("📷 Open Camera"):
-        st.session_state.show_camera = True
-        # uploaded_file = None # Attempt to clear uploader state (might not work perfectly)
-
-    camera_photo = None
-    if st.session_state.show_camera:
+# Inside a form: Streamlit reruns the script on every widget interaction, so
+# without the form each click re-parsed uploads and re-decoded images. The
+# form defers the rerun until the user explicitly hits Analyze.
+with st.form("input_form"):
+    col1_input, col2_input = st.columns(2)
+
+    with col1_input:
+        uploaded_file = st.file_uploader(
+            "📂 Upload an Image",
+            type=["jpg", "jpeg", "png", "webp"],
+            help="Select a food image file from your device. JPEG decodes fastest; PNG/WebP also work."
+        )
+
+    with col2_input:
         camera_photo = st.camera_input(
-            "Capture Photo (Click below)",
+            "📷 Capture Photo",
             key="camera",
             help="Use your device's camera to capture a food image."
-            )
-        if camera_photo:
-             st.session_state.show_camera = False
+        )
 
-st.divider()
+    submitted = st.form_submit_button("🔍 Analyze")
 
-# Determine input source
-image_source_data = None
-image_display = None
+st.divider()
 
+# Determine input source (both widgets hand over raw encoded bytes)
+image_bytes = None
 if uploaded_file is not None:
-    try:
-        image_display = Image.open(uploaded_file)
-        image_source_data = image_display # Pass PIL
-    except Exception as e:
-        st.error(f"Error opening uploaded file: {e}")
+    image_bytes = uploaded_file.getvalue()
 elif camera_photo is not None:
-    try:
-        img_bytes = camera_photo.getvalue()
-        image_display = Image.open(io.BytesIO(img_bytes)) # PIL for display
-        image_source_data = img_bytes # Pass bytes for processing
-    except Exception as e:
-        st.error(f"Error opening camera photo: {e}")
+    image_bytes = camera_photo.getvalue()
 
 # --- Main Logic & Display Area ---
 if model is None or class_names is None:
     st.warning("Model or class names failed to load. Cannot proceed.")
-elif image_source_data is not None:
-    if image_display:
-         st.image(image_display, caption="Selected Image", use_column_width=True)
-    else:
-         st.warning("Could not display the selected image.")
+elif submitted and image_bytes is not None:
+    # The browser decodes the raw bytes for display; Python only decodes
+    # inside predict_bytes, and only on a cache miss.
+    st.image(image_bytes, caption="Selected Image", use_column_width=True)
 
     with st.container():
         st.markdown("<div class='result-box'>", unsafe_allow_html=True)
         st.subheader("🧠 AI Prediction:")
 
         with st.spinner("🔍 Analyzing image..."):
-            processed_img = process_image(image_source_data, img_shape=IMG_SIZE) # Pass PIL or bytes
-
-            if processed_img is not None:
-                try:
-                    prediction = model.predict(processed_img)
-                    index = np.argmax(prediction[0])
-                    confidence = np.max(prediction[0]) * 100
-
+            try:
+                result = predict_bytes(image_bytes)
+                if result is not None:
+                    index, confidence = result
                     if 0 <= index < len(class_names):
                         food_name = class_names[index]
                         st.markdown(f"<p class='prediction-text'>{food_name.replace('_', ' ').title()}</p>", unsafe_allow_html=True)
@@ -229,14 +399,14 @@ elif image_source_data is not None:
                         st.caption("Note: Confidence indicates how sure the model is.")
                     else:
                         st.error(f"Prediction index {index} out of range.")
-                except Exception as e:
-                    st.error(f"Prediction error: {e}")
-            else:
-                st.error("Image processing failed.")
+                else:
+                    st.error("Image processing failed.")
+            except Exception as e:
+                st.error(f"Prediction error: {e}")
 
         st.markdown("</div>", unsafe_allow_html=True)
 else:
-    st.info("👆 Please upload an image or click 'Open Camera' to get started!")
+    st.info("👆 Upload an image or capture a photo, then hit 'Analyze'!")
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,81 @@
+"""Offline converter: trained Keras weights -> INT8 QDQ ONNX model.
+
+Run this once (not from Streamlit) to produce `food100_int8.onnx`:
+
+    python export_onnx.py
+
+`app.py` prefers the ONNX file over TFLite/Keras when it exists, serving
+through ONNX Runtime's int8 GEMM kernels with much lower per-call dispatch
+overhead than Keras `predict`. Calibration images come from the same
+CALIB_DIR used by export_tflite.py.
+
+Requires: tf2onnx, onnxruntime, onnxsim (pip install tf2onnx onnxruntime onnx-simplifier).
+"""
+
+import glob
+import os
+
+import numpy as np
+import tensorflow as tf
+import tf2onnx
+from onnxruntime.quantization import CalibrationDataReader, QuantFormat, quantize_static
+
+from export_tflite import CALIB_DIR, IMG_SIZE, NUM_CALIB_SAMPLES, build_inference_model
+
+ONNX_FP32_PATH = "food100.onnx"
+ONNX_INT8_PATH = "food100_int8.onnx"
+
+
+class FoodCalibrationReader(CalibrationDataReader):
+    """Feeds resized [0,255] float32 food images to the static quantizer."""
+
+    def __init__(self, input_name):
+        paths = sorted(glob.glob(os.path.join(CALIB_DIR, "*")))[:NUM_CALIB_SAMPLES]
+        if not paths:
+            raise FileNotFoundError(
+                f"No calibration images found in '{CALIB_DIR}/'. "
+                "Copy ~100 representative food photos there before exporting."
+            )
+        self.input_name = input_name
+        self.paths = iter(paths)
+
+    def get_next(self):
+        path = next(self.paths, None)
+        if path is None:
+            return None
+        img = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+        img = tf.image.resize(img, (IMG_SIZE, IMG_SIZE))
+        img = tf.cast(img[tf.newaxis, ...], tf.float32).numpy()
+        return {self.input_name: np.ascontiguousarray(img)}
+
+
+def main():
+    inference_model = build_inference_model()
+
+    # Dynamic batch dim: run_inference accepts (N, ...) batches.
+    spec = (tf.TensorSpec((None, IMG_SIZE, IMG_SIZE, 3), tf.float32, name="input_layer"),)
+    tf2onnx.convert.from_keras(inference_model, input_signature=spec, opset=13,
+                               output_path=ONNX_FP32_PATH)
+
+    # Fold every Conv->BatchNorm pair (W' = W*gamma/sqrt(var+eps), matching
+    # bias shift) before quantization, so BN disappears from the served graph
+    # and the QDQ pass sees plain convs. onnxsim does this constant folding.
+    import onnx
+    from onnxsim import simplify
+    simplified, ok = simplify(onnx.load(ONNX_FP32_PATH))
+    if not ok:
+        raise RuntimeError("onnx-simplifier could not validate the simplified graph")
+    onnx.save(simplified, ONNX_FP32_PATH)
+
+    quantize_static(
+        ONNX_FP32_PATH,
+        ONNX_INT8_PATH,
+        calibration_data_reader=FoodCalibrationReader("input_layer"),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+    )
+    print(f"Saved {ONNX_INT8_PATH} ({os.path.getsize(ONNX_INT8_PATH) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Offline converter: trained Keras weights -> INT8 TFLite model.
+
+Run this once (not from Streamlit) to produce `food100_int8.tflite`:
+
+    python export_tflite.py
+
+`app.py` automatically picks the .tflite file up when it exists and serves
+predictions through the TFLite interpreter instead of Keras. Calibration
+images for the INT8 quantizer are read from CALIB_DIR (a folder of food
+JPEGs, e.g. a sample of the training set).
+"""
+
+import glob
+import os
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras import layers
+
+IMG_SIZE = 224
+NUM_CLASSES = 100
+MODEL_WEIGHTS_PATH = "best_model_food100.keras"
+TFLITE_OUTPUT_PATH = "food100_int8.tflite"
+CALIB_DIR = "calibration_images"
+NUM_CALIB_SAMPLES = 100
+
+
+def build_training_model():
+    """Rebuilds the training topology (augmentation block + softmax head)
+    that the .keras weight files are saved against."""
+    data_augmentation = keras.Sequential([
+        layers.RandomFlip("horizontal"),
+        layers.RandomRotation(0.2),
+        layers.RandomZoom(0.2),
+        layers.RandomContrast(0.2)
+    ], name="data_augmentation")
+
+    base_model = tf.keras.applications.EfficientNetB0(
+        include_top=False,
+        weights=None,
+        input_shape=(IMG_SIZE, IMG_SIZE, 3)
+    )
+    base_model.trainable = False
+
+    inputs = keras.Input(shape=(IMG_SIZE, IMG_SIZE, 3), name="input_layer")
+    x = data_augmentation(inputs)
+    x = base_model(x, training=False)
+    x = layers.GlobalAveragePooling2D(name="pooling_layer")(x)
+    x = layers.Dropout(0.3, name="dropout_layer")(x)
+    outputs = layers.Dense(NUM_CLASSES, activation="softmax", name="output_layer")(x)
+    return keras.Model(inputs, outputs, name="EfficientNetB0_Food100")
+
+
+def base_model_of(model):
+    """The nested EfficientNetB0 sub-model inside a training/serving model."""
+    return next(l for l in model.layers
+                if isinstance(l, keras.Model) and not isinstance(l, keras.Sequential))
+
+
+def build_inference_model(weights_path=MODEL_WEIGHTS_PATH):
+    """Rebuilds the serving model (same structure as app.py) and loads weights."""
+    # Training-identical structure, needed so the weight file loads cleanly.
+    model = build_training_model()
+    model.load_weights(weights_path)
+    base_model = base_model_of(model)
+    output_layer = model.get_layer("output_layer")
+
+    # Serving model without the augmentation block, emitting logits (app.py
+    # recovers the winning probability in Python; softmax keeps argmax).
+    logits_layer = layers.Dense(NUM_CLASSES, activation=None, name="output_logits")
+    serving_inputs = keras.Input(shape=(IMG_SIZE, IMG_SIZE, 3), name="input_layer")
+    x = base_model(serving_inputs, training=False)
+    x = layers.GlobalAveragePooling2D(name="pooling_layer")(x)
+    x = layers.Dropout(0.3, name="dropout_layer")(x)
+    serving_outputs = logits_layer(x)
+    serving_model = keras.Model(serving_inputs, serving_outputs, name="EfficientNetB0_Food100_Serving")
+    logits_layer.set_weights(output_layer.get_weights())
+    return serving_model
+
+
+def gen_calib_images():
+    """Yields representative [0,255] float32 images for the INT8 calibrator."""
+    paths = sorted(glob.glob(os.path.join(CALIB_DIR, "*")))[:NUM_CALIB_SAMPLES]
+    if not paths:
+        raise FileNotFoundError(
+            f"No calibration images found in '{CALIB_DIR}/'. "
+            "Copy ~100 representative food photos there before exporting."
+        )
+    for path in paths:
+        img = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+        img = tf.image.resize(img, (IMG_SIZE, IMG_SIZE))
+        yield [tf.cast(img[tf.newaxis, ...], tf.float32)]
+
+
+def main():
+    inference_model = build_inference_model()
+
+    # The TFLite converter folds every Conv->BatchNorm pair into the conv
+    # weights/bias during conversion, so no BN ops survive in the .tflite.
+    converter = tf.lite.TFLiteConverter.from_keras_model(inference_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = gen_calib_images
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    tflite_model = converter.convert()
+
+    with open(TFLITE_OUTPUT_PATH, "wb") as f:
+        f.write(tflite_model)
+    print(f"Saved {TFLITE_OUTPUT_PATH} ({len(tflite_model) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Offline pruning: sparsify the trained model to cut inference FLOPs.
+
+Run this once (not from Streamlit) after training:
+
+    python prune_model.py
+
+Magnitude pruning ramps the serving model to 50% sparsity over a short
+fine-tune on the training set, strips the pruning wrappers, and writes the
+pruned weights back into the *training* topology before saving
+`best_model_food100_pruned.keras` - so the file loads anywhere the original
+weight file does (MODEL_WEIGHTS_PATH in app.py, or the exporters'
+`build_inference_model(weights_path=...)`). The sparse weights compress far
+better and the TFLite/ORT kernels skip the zeroed multiplies. Stacks with
+INT8 quantization.
+
+Requires: tensorflow_model_optimization (pip install tensorflow-model-optimization).
+"""
+
+import tensorflow as tf
+import tensorflow_model_optimization as tfmot
+
+from export_tflite import (IMG_SIZE, base_model_of, build_inference_model,
+                           build_training_model)
+
+TRAIN_DIR = "train_images"  # Folder of per-class subfolders, as used in training
+PRUNED_WEIGHTS_PATH = "best_model_food100_pruned.keras"
+TARGET_SPARSITY = 0.5
+FINE_TUNE_EPOCHS = 2
+BATCH_SIZE = 32
+
+
+def main():
+    inference_model = build_inference_model()
+    # The builder freezes the backbone for serving; the pruning fine-tune
+    # must update the surviving conv weights or the zeroed channels cost
+    # accuracy that nothing can recover.
+    inference_model.trainable = True
+
+    train_ds = tf.keras.utils.image_dataset_from_directory(
+        TRAIN_DIR,
+        image_size=(IMG_SIZE, IMG_SIZE),
+        batch_size=BATCH_SIZE,
+        label_mode="int",
+    )
+    end_step = tf.data.experimental.cardinality(train_ds).numpy() * FINE_TUNE_EPOCHS
+
+    schedule = tfmot.sparsity.keras.PolynomialDecay(
+        initial_sparsity=0.0,
+        final_sparsity=TARGET_SPARSITY,
+        begin_step=0,
+        end_step=end_step,
+    )
+    pruned = tfmot.sparsity.keras.prune_low_magnitude(inference_model, pruning_schedule=schedule)
+
+    # The serving head emits logits, hence from_logits=True here.
+    pruned.compile(
+        optimizer=tf.keras.optimizers.Adam(1e-5),
+        loss=tf.keras.losses.SparseCategoricalCrossentropy(from_logits=True),
+        metrics=["accuracy"],
+    )
+    pruned.fit(
+        train_ds,
+        epochs=FINE_TUNE_EPOCHS,
+        callbacks=[tfmot.sparsity.keras.UpdatePruningStep()],
+    )
+
+    stripped = tfmot.sparsity.keras.strip_pruning(pruned)
+
+    # Copy the pruned weights back into the training topology: the exporters
+    # and app.py load weight files through that structure (augmentation block
+    # + softmax Dense named "output_layer"), which the serving model lacks.
+    reference = build_training_model()
+    base_model_of(reference).set_weights(base_model_of(stripped).get_weights())
+    reference.get_layer("output_layer").set_weights(
+        stripped.get_layer("output_logits").get_weights())
+    reference.save(PRUNED_WEIGHTS_PATH)
+    print(f"Saved {PRUNED_WEIGHTS_PATH} at {TARGET_SPARSITY:.0%} sparsity; "
+          "re-run export_tflite.py / export_onnx.py with "
+          f"build_inference_model(weights_path='{PRUNED_WEIGHTS_PATH}').")
+
+
+if __name__ == "__main__":
+    main()